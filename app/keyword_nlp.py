@@ -1,20 +1,85 @@
 import os
-import json
+import time
+import random
+import hashlib
+import shutil
+from datetime import datetime
+from typing import Literal
+import asyncio
+import threading
+import httpx
+import openpyxl
 import pandas as pd
+import pyarrow.parquet as pq
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from dotenv import load_dotenv
+from aiolimiter import AsyncLimiter
+from diskcache import Cache
+from pyexcelerate import Workbook
 from google import genai
+from google.genai import errors, types
 from pydantic import BaseModel
 
 # ───────── 환경변수 및 API 키 설정 ─────────
 load_dotenv()  # 루트 디렉토리의 .env 파일 로드
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=GEMINI_API_KEY)
 
 # ───────── 파일 경로 변수 설정 ─────────
 INPUT_EXCEL_PATH = os.path.join("data", "school.xlsx")
 OUTPUT_DIR = "result"
 OUTPUT_EXCEL_PATH = os.path.join(OUTPUT_DIR, "emotion_analysis_result.xlsx")
+CHECKPOINT_DIR = os.path.join(OUTPUT_DIR, "emotion_analysis_checkpoint")  # 중간 저장(이어하기)용 Parquet 조각 파일 폴더
+CACHE_DIR = os.path.join("cache", "emotion")
+
+# 원본 파일에서 읽어올 컬럼 / 결과 파일 컬럼 순서
+INPUT_COLUMNS = ["no", "title", "body", "vote", "comment"]
+RESULT_COLUMNS = INPUT_COLUMNS + ["emotion_result"]
+
+# ───────── 동시 요청 설정 ─────────
+CONCURRENCY = 16  # 동시에 진행할 최대 Gemini API 요청 수
+BATCH_SIZE = 16   # 한 번의 Gemini API 요청에 묶어 보낼 문장 수
+MIN_TEXT_LENGTH = 2  # 앞뒤 공백을 제외한 길이가 이보다 짧은 문장은 API 요청 없이 None 처리
+MEMORY_CACHE_SIZE = 100_000  # 프로세스 안에서 기억해 둘 최대 감정 분석 결과 수
+# 동시 실행 방식: "async"(asyncio, 기본값) 또는 "thread"(스레드 풀, asyncio를 쓸 수 없는 환경용)
+EXECUTORS = ("async", "thread")
+EXECUTOR = os.getenv("EMOTION_EXECUTOR", "async")
+
+# ───────── Gemini 클라이언트 설정 ─────────
+GEMINI_MODEL = "gemini-2.0-flash"
+# 요청마다 TCP/TLS 연결을 새로 맺지 않도록 HTTP/2 연결 풀 하나를 모든 비동기 요청에서 재사용
+# (동시 요청 수만큼 연결을 유지)
+async_http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY),
+    timeout=httpx.Timeout(120.0),
+)
+client = genai.Client(
+    api_key=GEMINI_API_KEY,
+    http_options=types.HttpOptions(httpx_async_client=async_http_client),
+)
+
+# ───────── 중간 저장 설정 ─────────
+CHECKPOINT_TYPE_SUFFIX = "__type"  # 여러 타입이 섞인 컬럼의 원래 타입을 기록하는 컬럼 접미사
+CHECKPOINT_DECODERS = {
+    "int": int,
+    "float": float,
+    "bool": lambda value: value == "True",
+    "datetime": pd.Timestamp,
+}
+CHECKPOINT_EVERY = 50  # 새로 분석된 행이 이만큼 쌓일 때마다 체크포인트(Parquet)에 중간 저장
+
+# ───────── API 호출 한도 설정 ─────────
+# 한도를 넘겨 429 응답을 받기 전에 미리 속도를 조절 (Gemini Flash 무료 티어 기준)
+GEMINI_RPM = 60          # 분당 최대 요청 수
+GEMINI_TPM = 1_000_000   # 분당 최대 토큰 수
+MAX_RETRIES = 5          # 429 응답 시 최대 재시도 횟수
+BACKOFF_BASE = 1.0       # 재시도 대기 시간 초기값(초)
+BACKOFF_MAX = 60.0       # 재시도 대기 시간 최대값(초)
+
+rpm_limiter = AsyncLimiter(GEMINI_RPM, 60)
+tpm_limiter = AsyncLimiter(GEMINI_TPM, 60)
 
 # ───────── 프롬프트 정의 ─────────
 # 문장이 긍정적이면 Positive, 부정적이면 Negative, 중립이면 Neutral로 응답
@@ -24,14 +89,226 @@ SYSTEM_PROMPT = (
     "문장:"
 )
 
+# 여러 문장을 하나의 요청으로 묶어 보낼 때 사용하는 프롬프트
+BATCH_SYSTEM_PROMPT = (
+    "다음 번호가 매겨진 각 문장의 전체 맥락을 고려하여 감정 분석을 진행하세요. "
+    "각 문장이 긍정적이면 Positive로, 부정적이면 Negative로, 중립이면 Neutral로 판단하여 "
+    '문장 번호 순서대로 {"result": ...} 형식의 JSON 배열로 응답하세요. '
+    "문장 목록:"
+)
+
 # ───────── 감정 분석 API 응답 모델 정의 ─────────
+# 응답을 세 가지 값으로 제한하여 Gemini가 다른 문자열을 생성하지 않도록 함
 class EmotionResultModel(BaseModel):
-    result: str
+    result: Literal["Positive", "Negative", "Neutral"]
+
+# ───────── Gemini 요청 설정 ─────────
+# 요청마다 설정/프롬프트 앞부분을 새로 만들지 않도록 모듈 로드 시 한 번만 생성
+PROMPT_PREFIX = f"{SYSTEM_PROMPT} "
+BATCH_PROMPT_PREFIX = f"{BATCH_SYSTEM_PROMPT}\n"
+GENERATE_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=EmotionResultModel,
+)
+BATCH_GENERATE_CONFIG = types.GenerateContentConfig(
+    response_mime_type="application/json",
+    response_schema=list[EmotionResultModel],
+)
+
+# ───────── 스레드 풀용 API 호출 한도 제한기 ─────────
+class ThreadRateLimiter:
+    """
+    여러 스레드가 함께 쓰는 호출 한도 제한기입니다. (time_period초 동안 최대 max_rate만큼 허용하는 슬라이딩 윈도우)
+    스레드 풀 실행 방식에서 AsyncLimiter 대신 사용합니다.
+    """
+
+    def __init__(self, max_rate: int, time_period: float = 60):
+        self.max_rate = max_rate
+        self.time_period = time_period
+        self._lock = threading.Lock()
+        self._history = deque()  # (사용 시각, 사용량)
+        self._used = 0
+
+    def acquire(self, amount: int = 1):
+        """한도에 여유가 생길 때까지 기다린 뒤 amount만큼 사용합니다."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # 윈도우를 벗어난 사용 기록은 정리
+                while self._history and now - self._history[0][0] >= self.time_period:
+                    self._used -= self._history.popleft()[1]
+                if self._used + amount <= self.max_rate:
+                    self._history.append((now, amount))
+                    self._used += amount
+                    return
+                wait = self.time_period - (now - self._history[0][0])
+            time.sleep(wait)
+
+thread_rpm_limiter = ThreadRateLimiter(GEMINI_RPM, 60)
+thread_tpm_limiter = ThreadRateLimiter(GEMINI_TPM, 60)
+
+# ───────── 감정 분석 결과 캐시 ─────────
+class ResultCache:
+    """
+    감정 분석 결과를 2단계로 캐시합니다. (프로세스 안의 LRU → 디스크 캐시 순서로 조회)
+    키는 문장의 단건 분석 프롬프트 SHA-1 해시이며, 재실행 시 동일한 문장은 API를 다시 호출하지 않습니다.
+    결과가 없는(None) 문장은 저장하지 않아 다음 요청 때 다시 시도합니다.
+    """
+
+    def __init__(self, directory: str, memory_size: int):
+        self._disk = Cache(directory)
+        self._memory = OrderedDict()  # 캐시 키 → 결과 (최근에 쓴 순서)
+        self._memory_size = memory_size
+        self._lock = threading.Lock()  # 스레드 풀 실행 방식에서도 함께 쓰므로 잠금
+
+    def get(self, text: str) -> str:
+        """문장의 캐시된 결과를 돌려줍니다. (없으면 None)"""
+        key = get_cache_key(text)
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                return result
+
+        result = self._disk.get(key)
+        if result is not None:
+            self._remember(key, result)
+        return result
+
+    def put(self, text: str, result: str):
+        """문장의 결과를 저장합니다. (None이면 저장하지 않음)"""
+        if result is None:
+            return
+        key = get_cache_key(text)
+        self._disk[key] = result
+        self._remember(key, result)
+
+    def _remember(self, key: str, result: str):
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            if len(self._memory) > self._memory_size:
+                self._memory.popitem(last=False)
+
+cache = ResultCache(CACHE_DIR, MEMORY_CACHE_SIZE)
+
+# ───────── Gemini API 호출 함수 ─────────
+def estimate_tokens(prompt: str) -> int:
+    """프롬프트의 토큰 수를 글자 수 / 4로 대략 추정합니다. (TPM 한도를 넘지 않도록 보정)"""
+    return min(max(len(prompt) // 4, 1), GEMINI_TPM)
+
+def get_retry_delay(error: errors.APIError, attempt: int) -> float:
+    """
+    429(요청 한도 초과) 응답이면 재시도 전 대기 시간을 돌려줍니다.
+    상한을 두고 2배씩 늘리되, 요청이 한꺼번에 몰리지 않도록 무작위로 분산합니다.
+    다른 오류이거나 재시도를 모두 소진했으면 예외를 그대로 다시 발생시킵니다.
+    """
+    if error.code != 429 or attempt == MAX_RETRIES:
+        raise error
+    delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+    tqdm.write(f"Gemini API 요청 한도 초과, {delay:.1f}초 후 재시도 ({attempt + 1}/{MAX_RETRIES})")
+    return delay
+
+async def generate_content_async(prompt: str, config: types.GenerateContentConfig):
+    """
+    RPM/TPM 한도 안에서 Gemini API를 호출합니다.
+    429(요청 한도 초과) 응답을 받으면 지터를 섞은 지수 백오프 후 다시 한도 대기열에 들어갑니다.
+    
+    Args:
+        prompt (str): 전송할 프롬프트
+        config (types.GenerateContentConfig): generate_content 설정 값
+        
+    Returns:
+        GenerateContentResponse: Gemini API 응답 (재시도를 모두 소진하면 마지막 예외를 그대로 발생)
+    """
+    estimated_tokens = estimate_tokens(prompt)
+    for attempt in range(MAX_RETRIES + 1):
+        await tpm_limiter.acquire(estimated_tokens)
+        async with rpm_limiter:
+            try:
+                return await client.aio.models.generate_content(
+                    model=GEMINI_MODEL,
+                    contents=[prompt],
+                    config=config,
+                )
+            except errors.APIError as e:
+                delay = get_retry_delay(e, attempt)
+        await asyncio.sleep(delay)
+
+def generate_content(prompt: str, config: types.GenerateContentConfig):
+    """generate_content_async의 동기 버전입니다. (스레드 풀 실행 방식에서 사용)"""
+    estimated_tokens = estimate_tokens(prompt)
+    for attempt in range(MAX_RETRIES + 1):
+        thread_tpm_limiter.acquire(estimated_tokens)
+        thread_rpm_limiter.acquire()
+        try:
+            return client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=[prompt],
+                config=config,
+            )
+        except errors.APIError as e:
+            delay = get_retry_delay(e, attempt)
+        time.sleep(delay)
 
 # ───────── 감정 분석 함수 ─────────
-def analyze_emotion(text: str) -> str:
+def is_trivial_text(text: str) -> bool:
+    """빈 문자열, 공백뿐인 문자열, 한 글자짜리 노이즈처럼 분석할 필요가 없는 문장인지 확인합니다."""
+    return len(text.strip()) < MIN_TEXT_LENGTH
+
+def get_cache_key(text: str) -> str:
+    """
+    문장의 단건 분석 프롬프트를 기준으로 캐시 키(SHA-1)를 만듭니다.
+    (단건/배치 분석이 같은 캐시를 공유)
     """
-    Gemini API를 이용하여 주어진 텍스트의 감정 분석(긍정/부정/중립)을 수행합니다.
+    prompt = PROMPT_PREFIX + text
+    return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
+def build_batch_prompt(texts: list[str]) -> str:
+    """
+    여러 문장에 번호를 매겨 하나의 배치 분석 프롬프트로 묶습니다.
+    (문장 안의 줄바꿈은 번호 구분이 흐려지지 않도록 공백으로 치환)
+    """
+    numbered = "\n".join(f"{n}. {' '.join(text.split())}" for n, text in enumerate(texts, start=1))
+    return BATCH_PROMPT_PREFIX + numbered
+
+def store_emotion_response(text: str, response) -> str:
+    """단건 분석 응답에서 감정 분석 결과를 꺼내 캐시에 저장합니다. (파싱된 결과가 없으면 None)"""
+    result = response.parsed.result if response.parsed is not None else None
+    cache.put(text, result)
+    return result
+
+def lookup_cached_results(texts: list[str]) -> tuple[list[str], list[int]]:
+    """
+    배치의 캐시된 결과를 찾습니다.
+    
+    Returns:
+        tuple[list[str], list[int]]: (입력 순서의 결과 목록(캐시에 없으면 None), 요청이 필요한 문장 위치 목록)
+    """
+    results = [cache.get(text) for text in texts]
+    return results, [i for i, result in enumerate(results) if result is None]
+
+def store_batch_response(texts: list[str], missing: list[int], response) -> list[str]:
+    """
+    배치 분석 응답에서 요청한 문장 순서대로 결과 목록을 꺼내 캐시에 저장합니다.
+    파싱된 결과가 없거나 배열 길이가 요청한 문장 수와 맞지 않으면 None을 돌려줍니다. (단건 분석으로 대체)
+    """
+    if response.parsed is None or len(response.parsed) != len(missing):
+        return None
+    batch_results = [result_obj.result for result_obj in response.parsed]
+    for i, result in zip(missing, batch_results):
+        cache.put(texts[i], result)
+    return batch_results
+
+def fill_results(results: list[str], missing: list[int], batch_results: list[str]) -> list[str]:
+    """요청한 문장의 결과를 캐시에서 찾은 결과 목록의 제자리에 채워 넣습니다."""
+    for i, result in zip(missing, batch_results):
+        results[i] = result
+    return results
+
+async def analyze_emotion_async(text: str) -> str:
+    """
+    Gemini API(비동기 클라이언트)를 이용하여 주어진 텍스트의 감정 분석(긍정/부정/중립)을 수행합니다.
     
     Args:
         text (str): 분석할 문장
@@ -39,115 +316,541 @@ def analyze_emotion(text: str) -> str:
     Returns:
         str: "Positive", "Negative", "Neutral" 중 하나 (API 응답에 따라 결과가 없으면 None)
     """
+    if is_trivial_text(text):
+        return None
+    cached_result = cache.get(text)
+    if cached_result is not None:
+        return cached_result
+
     try:
-        prompt = f"{SYSTEM_PROMPT} {text}"
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[prompt],
-            config={
-                'response_mime_type': 'application/json',
-                'response_schema': EmotionResultModel,
-            }
-        )
-        # Gemini API의 파싱된 결과가 존재하는 경우 사용
-        if response.parsed is not None:
-            result_obj = response.parsed  # EmotionResultModel 인스턴스
-            result = result_obj.result
-        else:
-            # 파싱 실패 시, API 응답 문자열로부터 수동 파싱 시도
-            result_text = response.text.strip()
-            try:
-                result_json = json.loads(result_text)
-                result = result_json.get("result", None)
-            except Exception:
-                # JSON 파싱 실패 시, "Positive"/"Negative"/"Neutral" 단어 포함 여부로 판별
-                if "Positive" in result_text:
-                    result = "Positive"
-                elif "Negative" in result_text:
-                    result = "Negative"
-                elif "Neutral" in result_text:
-                    result = "Neutral"
-                else:
-                    result = result_text
-        return result
+        response = await generate_content_async(PROMPT_PREFIX + text, config=GENERATE_CONFIG)
+        return store_emotion_response(text, response)
     except Exception as e:
         tqdm.write(f"Gemini API 호출 중 오류 발생: {e}")
         return None
 
-def main():
-    # 결과 저장 폴더 생성 (없으면)
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
+def analyze_emotion(text: str) -> str:
+    """analyze_emotion_async의 동기 버전입니다. (스레드 풀 실행 방식에서 사용)"""
+    if is_trivial_text(text):
+        return None
+    cached_result = cache.get(text)
+    if cached_result is not None:
+        return cached_result
+
+    try:
+        response = generate_content(PROMPT_PREFIX + text, config=GENERATE_CONFIG)
+        return store_emotion_response(text, response)
+    except Exception as e:
+        tqdm.write(f"Gemini API 호출 중 오류 발생: {e}")
+        return None
+
+async def analyze_emotions_batch_async(texts: list[str]) -> list[str]:
+    """
+    여러 문장을 하나의 Gemini API 요청으로 묶어 감정 분석을 수행합니다.
+    응답 배열의 길이가 입력과 맞지 않거나 파싱에 실패하면 문장별 단건 분석으로 대체합니다.
+    
+    Args:
+        texts (list[str]): 분석할 문장 목록 (최대 BATCH_SIZE개)
+        
+    Returns:
+        list[str]: 입력 순서와 동일한 순서의 감정 분석 결과 목록
+    """
+    results, missing = lookup_cached_results(texts)
+    if not missing:
+        return results
+
+    batch_results = None
+    try:
+        response = await generate_content_async(
+            build_batch_prompt([texts[i] for i in missing]),
+            config=BATCH_GENERATE_CONFIG,
+        )
+        batch_results = store_batch_response(texts, missing, response)
+    except Exception as e:
+        tqdm.write(f"Gemini API 배치 호출 중 오류 발생, 단건 분석으로 대체합니다: {e}")
+
+    if batch_results is None:
+        # 배치 결과를 문장과 짝지을 수 없으면 문장별로 다시 요청
+        batch_results = await asyncio.gather(*(analyze_emotion_async(texts[i]) for i in missing))
+    return fill_results(results, missing, batch_results)
+
+def analyze_emotions_batch(texts: list[str]) -> list[str]:
+    """analyze_emotions_batch_async의 동기 버전입니다. (스레드 풀 실행 방식에서 사용)"""
+    results, missing = lookup_cached_results(texts)
+    if not missing:
+        return results
+
+    batch_results = None
+    try:
+        response = generate_content(
+            build_batch_prompt([texts[i] for i in missing]),
+            config=BATCH_GENERATE_CONFIG,
+        )
+        batch_results = store_batch_response(texts, missing, response)
+    except Exception as e:
+        tqdm.write(f"Gemini API 배치 호출 중 오류 발생, 단건 분석으로 대체합니다: {e}")
+
+    if batch_results is None:
+        # 배치 결과를 문장과 짝지을 수 없으면 문장별로 다시 요청
+        batch_results = [analyze_emotion(texts[i]) for i in missing]
+    return fill_results(results, missing, batch_results)
+
+def iter_emotion_batches_threaded(texts: list[str]):
+    """
+    문장 목록을 BATCH_SIZE개씩 묶어 스레드 풀에서 감정 분석을 수행하고, 완료되는 배치부터 차례로 돌려줍니다.
+    (CONCURRENCY개 스레드가 네트워크 대기 시간을 겹쳐서 진행)
+    
+    Args:
+        texts (list[str]): 분석할 문장 목록
+        
+    Yields:
+        tuple[list[str], list[str]]: (배치 문장 목록, 같은 순서의 감정 분석 결과 목록)
+    """
+    executor = ThreadPoolExecutor(max_workers=CONCURRENCY)
+    try:
+        futures = {
+            executor.submit(analyze_emotions_batch, texts[i:i + BATCH_SIZE]): texts[i:i + BATCH_SIZE]
+            for i in range(0, len(texts), BATCH_SIZE)
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc="감정 분석 진행중"):
+            yield futures[future], future.result()
+    finally:
+        # 중단되면 아직 시작하지 않은 배치는 취소
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def save_fast(df: pd.DataFrame, path: str):
+    """
+    pyexcelerate로 DataFrame을 xlsx 파일로 저장합니다. (openpyxl 기반의 df.to_excel보다 훨씬 빠름)
+    
+    Args:
+        df (pd.DataFrame): 저장할 데이터
+        path (str): 저장할 xlsx 파일 경로
+    """
+    # NaN은 빈 셀로 저장되도록 None으로 변환
+    values = df.astype(object).where(df.notna(), None).values.tolist()
+    wb = Workbook()
+    wb.new_sheet("Sheet1", data=[df.columns.tolist()] + values)
+    wb.save(path)
+
+def get_value_type(value) -> str:
+    """체크포인트에 문자열로 저장하는 값의 원래 타입 이름을 돌려줍니다. (결측값이면 None)"""
+    if pd.isna(value):
+        return None
+    if pd.api.types.is_bool(value):
+        return "bool"
+    if pd.api.types.is_integer(value):
+        return "int"
+    if pd.api.types.is_float(value):
+        return "float"
+    if isinstance(value, datetime):
+        return "datetime"
+    return "str"
+
+def encode_checkpoint(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Parquet은 한 컬럼에 여러 타입을 담을 수 없으므로(억지로 담으면 변환 오류가 나거나 다른 타입으로 바뀜),
+    여러 타입이 섞인 컬럼(예: 숫자와 문자열이 섞인 vote, 숫자와 날짜가 섞인 컬럼)은 문자열로 바꾸고
+    값마다 원래 타입을 `{컬럼}__type` 컬럼에 함께 기록합니다. (decode_checkpoint로 원래 타입을 복원)
+    """
+    encoded = {}
+    for column in df.columns:
+        values = df[column]
+        # numpy 스칼라도 같은 파이썬 타입으로 세어, 결측값을 뺀 값의 타입이 둘 이상이면 문자열로 저장
+        if values.dtype == object and values.dropna().map(get_value_type).nunique() > 1:
+            encoded[column] = values.astype("string")
+            encoded[column + CHECKPOINT_TYPE_SUFFIX] = values.map(get_value_type)
+        else:
+            encoded[column] = values
+    return pd.DataFrame(encoded)
+
+def decode_checkpoint(df: pd.DataFrame) -> pd.DataFrame:
+    """encode_checkpoint로 저장한 체크포인트의 값을 `{컬럼}__type`에 기록된 원래 타입으로 되돌립니다."""
+    type_columns = [column for column in df.columns if column.endswith(CHECKPOINT_TYPE_SUFFIX)]
+    for type_column in type_columns:
+        column = type_column[:-len(CHECKPOINT_TYPE_SUFFIX)]
+        # 숫자만 남은 컬럼이 float으로 바뀌지 않도록 object 컬럼으로 되돌림
+        df[column] = pd.Series([
+            None if pd.isna(value_type) else CHECKPOINT_DECODERS.get(value_type, str)(value)
+            for value, value_type in zip(df[column].astype(object), df[type_column])
+        ], index=df.index, dtype=object)
+    return df.drop(columns=type_columns)
+
+def save_checkpoint(new_rows: list[tuple]) -> bool:
+    """
+    쌓여 있는 새 행만 체크포인트 폴더에 새 Parquet 조각 파일로 추가 저장합니다. (저장 후 new_rows는 비워짐)
+    기존 결과를 다시 쓰지 않으므로 결과가 늘어나도 저장 비용과 메모리 사용량이 일정합니다.
+    저장 도중 중단되어도 깨진 조각 파일이 남지 않도록 임시 파일에 쓴 뒤 교체합니다.
+    
+    Args:
+        new_rows (list[tuple]): 아직 저장되지 않은 새 행 목록 (RESULT_COLUMNS 순서의 튜플)
+        
+    Returns:
+        bool: 저장 성공 여부 (실패 시 new_rows는 그대로 남아 다음 저장 때 다시 저장)
+    """
+    if not new_rows:
+        return True
 
-    # 1) 원본 데이터 불러오기
     try:
-        df_input = pd.read_excel(INPUT_EXCEL_PATH)
+        os.makedirs(CHECKPOINT_DIR, exist_ok=True)
+        part_path = os.path.join(CHECKPOINT_DIR, f"part-{time.time_ns()}.parquet")
+        tmp_path = f"{part_path}.tmp"
+        encode_checkpoint(pd.DataFrame(new_rows, columns=RESULT_COLUMNS)).to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, part_path)
+    except Exception as e:
+        tqdm.write(f"중간 저장 오류: {e}")
+        return False
+    new_rows.clear()
+    return True
+
+def list_checkpoint_parts() -> list[str]:
+    """체크포인트 폴더의 조각 파일 경로를 저장된 순서대로 돌려줍니다. (체크포인트가 없으면 빈 목록)"""
+    if not os.path.isdir(CHECKPOINT_DIR):
+        return []
+    # 임시 파일(.tmp)은 저장 도중 중단된 조각이므로 제외
+    part_names = sorted(name for name in os.listdir(CHECKPOINT_DIR) if name.endswith(".parquet"))
+    return [os.path.join(CHECKPOINT_DIR, name) for name in part_names]
+
+def load_checkpoint() -> pd.DataFrame:
+    """
+    체크포인트 폴더의 조각 파일을 모두 읽어 하나의 결과로 합칩니다. (읽기 실패 시 예외 발생)
+    조각마다 여러 타입이 섞인 컬럼이 다를 수 있으므로 조각별로 원래 타입을 복원한 뒤 합칩니다.
+    
+    Returns:
+        pd.DataFrame: RESULT_COLUMNS 순서의 저장된 결과 (체크포인트가 없으면 빈 데이터프레임)
+    """
+    parts = [
+        decode_checkpoint(pd.read_parquet(path)).reindex(columns=RESULT_COLUMNS)
+        for path in list_checkpoint_parts()
+    ]
+    if not parts:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+def load_checkpoint_nos() -> set:
+    """
+    체크포인트 조각마다 no 컬럼(과 타입 기록 컬럼)만 읽어 이미 처리된 no 목록을 만듭니다. (읽기 실패 시 예외 발생)
+    결과 전체를 불러오지 않으므로 결과가 늘어나도 시작 시 메모리 사용량이 no 목록 크기로 유지됩니다.
+    """
+    type_column = "no" + CHECKPOINT_TYPE_SUFFIX
+    processed_nos = set()
+    for path in list_checkpoint_parts():
+        columns = ["no", type_column] if type_column in pq.read_schema(path).names else ["no"]
+        processed_nos.update(decode_checkpoint(pd.read_parquet(path, columns=columns))["no"].dropna().tolist())
+    return processed_nos
+
+def save_final_result() -> bool:
+    """
+    체크포인트에 저장된 결과를 no 순서로 정렬하여 최종 결과 엑셀로 저장하고, 저장이 끝나면 체크포인트를 지웁니다.
+    (다음 실행부터는 결과 엑셀을 기준으로 이어서 처리하므로, 결과 엑셀을 지우면 처음부터 다시 분석)
+    
+    Returns:
+        bool: 최종 결과 저장 성공 여부
+    """
+    try:
+        df_result = load_checkpoint()
+        # 숫자가 아닌 no는 맨 뒤로 보내고, no가 같은 행은 기존 순서를 유지
+        df_result = df_result.sort_values(
+            "no",
+            key=lambda column: pd.to_numeric(column, errors="coerce"),
+            na_position="last",
+            kind="stable",
+        )
+        save_fast(df_result, OUTPUT_EXCEL_PATH)
+    except Exception as e:
+        print(f"최종 결과 저장 오류: {e} (체크포인트: '{CHECKPOINT_DIR}')")
+        return False
+
+    shutil.rmtree(CHECKPOINT_DIR, ignore_errors=True)
+    return True
+
+def iter_rows(df: pd.DataFrame, columns: list[str] = INPUT_COLUMNS):
+    """행마다 Series를 만들지 않도록 필요한 컬럼을 배열로 꺼내 행 튜플로 순회합니다."""
+    return zip(*(df[column].to_numpy() for column in columns))
+
+def group_pending_rows(df_pending: pd.DataFrame) -> tuple[list[tuple], dict[str, list[tuple]]]:
+    """
+    아직 처리되지 않은 행을 Gemini API에 요청할 body별로 묶습니다.
+    body가 NaN이거나 분석할 필요가 없는 행은 요청하지 않고 바로 결과 행(None)으로 만듭니다.
+    
+    Args:
+        df_pending (pd.DataFrame): 아직 처리되지 않은 원본 행
+        
+    Returns:
+        tuple[list[tuple], dict[str, list[tuple]]]: (바로 만들어진 결과 행 목록, body별 원본 행 목록)
+    """
+    # NaN은 결측값으로 둔 채 문자열로 바꾸고 앞뒤 공백 제거 후, 요청하지 않을 행을 한 번에 판별
+    body_texts = df_pending["body"].astype("string").str.strip()
+    skip_mask = (body_texts.str.len() < MIN_TEXT_LENGTH).fillna(True).to_numpy(dtype=bool)
+
+    new_rows = [(*row, None) for row in iter_rows(df_pending.loc[skip_mask])]
+
+    # 같은 body는 한 번만 요청하도록 body별로 행을 묶음 (순서 유지)
+    rows_by_text = {}
+    for text, row in zip(body_texts.to_numpy()[~skip_mask], iter_rows(df_pending.loc[~skip_mask])):
+        rows_by_text.setdefault(text, []).append(row)
+    return new_rows, rows_by_text
+
+def analyze_pending_rows_threaded(df_pending: pd.DataFrame) -> bool:
+    """
+    아직 처리되지 않은 행의 감정 분석을 스레드 풀로 수행하고, CHECKPOINT_EVERY개마다 체크포인트에 중간 저장합니다.
+    (asyncio를 쓸 수 없는 환경용) 중단(Ctrl+C 등)되더라도 그때까지 분석된 행은 저장됩니다.
+    
+    Args:
+        df_pending (pd.DataFrame): 아직 처리되지 않은 원본 행
+        
+    Returns:
+        bool: 분석된 행이 모두 체크포인트에 저장되었는지 여부
+    """
+    new_rows, rows_by_text = group_pending_rows(df_pending)
+    try:
+        for batch, results in iter_emotion_batches_threaded(list(rows_by_text)):
+            for text, emotion_result in zip(batch, results):
+                new_rows.extend((*row, emotion_result) for row in rows_by_text[text])
+
+            if len(new_rows) >= CHECKPOINT_EVERY:
+                save_checkpoint(new_rows)
+    finally:
+        # 정상 종료/중단 모두 남은 행을 저장 (중간 저장에 실패한 행도 함께 다시 저장)
+        save_checkpoint(new_rows)
+    return not new_rows
+
+# ───────── 스트리밍 처리 함수 ─────────
+def open_input_rows(path: str):
+    """
+    openpyxl 읽기 전용 모드로 원본 엑셀을 열어, 한 행씩 INPUT_COLUMNS 순서의 튜플로 읽어오는 이터레이터를 만듭니다.
+    (파일 전체를 메모리에 올리지 않음)
+    
+    Args:
+        path (str): 원본 엑셀 파일 경로
+        
+    Returns:
+        Iterator[tuple]: 헤더를 제외한 원본 행 이터레이터
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    rows = wb.active.iter_rows(values_only=True)
+    header = list(next(rows, ()))
+    missing = [column for column in INPUT_COLUMNS if column not in header]
+    if missing:
+        wb.close()
+        raise ValueError(f"엑셀 파일에 {missing} 컬럼이 없습니다.")
+    indices = [header.index(column) for column in INPUT_COLUMNS]
+
+    def iterate():
+        try:
+            for values in rows:
+                # pd.read_excel처럼 완전히 빈 행은 건너뜀
+                if all(value is None for value in values):
+                    continue
+                yield tuple(values[i] if i < len(values) else None for i in indices)
+        finally:
+            wb.close()
+
+    return iterate()
+
+async def produce_batches(rows, processed_nos: set, work_queue: asyncio.Queue,
+                          result_queue: asyncio.Queue, rows_by_text: dict):
+    """
+    원본 행을 읽어 아직 처리되지 않은 행의 body를 BATCH_SIZE개씩 묶어 작업 큐에 넣습니다. (producer)
+    분석할 필요가 없는 행은 바로 결과 큐로 보내고, 이미 요청 중인 body와 같은 행은 그 요청 결과를 함께 사용합니다.
+    """
+    batch = []
+    for row in rows:
+        no, title, body, vote, comment = row
+        # 이미 처리된 no이면 스킵
+        if no is not None and no in processed_nos:
+            continue
+
+        body_text = str(body).strip() if body is not None else ""
+        if is_trivial_text(body_text):
+            await result_queue.put((*row, None))
+        elif body_text in rows_by_text:
+            rows_by_text[body_text].append(row)
+        else:
+            rows_by_text[body_text] = [row]
+            batch.append(body_text)
+            if len(batch) == BATCH_SIZE:
+                await work_queue.put(batch)
+                batch = []
+
+    if batch:
+        await work_queue.put(batch)
+    # 작업자마다 종료 신호 전달
+    for _ in range(CONCURRENCY):
+        await work_queue.put(None)
+
+async def emotion_worker(work_queue: asyncio.Queue, result_queue: asyncio.Queue, rows_by_text: dict):
+    """작업 큐에서 배치를 꺼내 감정 분석을 수행하고, 같은 body를 가진 행들의 결과를 결과 큐에 넣습니다. (worker)"""
+    while (batch := await work_queue.get()) is not None:
+        results = await analyze_emotions_batch_async(batch)
+        for text, emotion_result in zip(batch, results):
+            for row in rows_by_text.pop(text):
+                await result_queue.put((*row, emotion_result))
+
+async def analyze_batches(work_queue: asyncio.Queue, result_queue: asyncio.Queue, rows_by_text: dict):
+    """작업자(worker) CONCURRENCY개를 실행하고, 모두 끝나면 결과 큐에 쓰기 종료 신호를 넣습니다."""
+    async with asyncio.TaskGroup() as tg:
+        for _ in range(CONCURRENCY):
+            tg.create_task(emotion_worker(work_queue, result_queue, rows_by_text))
+    await result_queue.put(None)
+
+async def write_results(result_queue: asyncio.Queue) -> bool:
+    """
+    결과 큐에서 완료된 행을 꺼내 CHECKPOINT_EVERY개마다 체크포인트에 추가 저장합니다. (writer)
+    저장되지 않은 행만 들고 있으므로 결과가 늘어나도 메모리 사용량이 일정합니다.
+    중단(Ctrl+C 등)되더라도 그때까지 분석된 행은 체크포인트에 저장됩니다.
+    
+    Returns:
+        bool: 분석된 행이 모두 체크포인트에 저장되었는지 여부
+    """
+    new_rows = []
+    progress = tqdm(desc="감정 분석 진행중", unit="행")
+    try:
+        while (row := await result_queue.get()) is not None:
+            new_rows.append(row)
+            progress.update()
+
+            if len(new_rows) >= CHECKPOINT_EVERY:
+                save_checkpoint(new_rows)
+    finally:
+        # 정상 종료/중단 모두 남은 행을 저장 (중간 저장에 실패한 행도 함께 다시 저장)
+        save_checkpoint(new_rows)
+        progress.close()
+    return not new_rows
+
+async def run_streaming(processed_nos: set) -> bool:
+    """
+    원본 엑셀을 한 행씩 읽으면서 감정 분석과 결과 저장을 동시에 진행합니다. (입력 전체를 DataFrame으로 만들지 않음)
+    읽기(producer) → 분석(worker CONCURRENCY개) → 쓰기(writer)를 크기가 제한된 큐로 연결하여 메모리 사용량을 일정하게 유지합니다.
+    최종 결과 엑셀은 모든 분석이 끝난 뒤 no 순서로 정렬하여 한 번만 저장합니다.
+    
+    Args:
+        processed_nos (set): 이미 처리된 no 목록
+        
+    Returns:
+        bool: 최종 결과 저장까지 모두 끝났는지 여부
+    """
+    try:
+        rows = open_input_rows(INPUT_EXCEL_PATH)
     except Exception as e:
         print(f"엑셀 파일({INPUT_EXCEL_PATH}) 읽기 오류: {e}")
-        return
+        return False
+
+    rows_by_text = {}  # 요청 중인 body → 해당 body를 가진 원본 행 목록
+    work_queue = asyncio.Queue(maxsize=2 * CONCURRENCY)
+    result_queue = asyncio.Queue(maxsize=2 * CONCURRENCY * BATCH_SIZE)
+
+    # 한 작업이 실패하면 나머지 작업도 함께 취소되도록 TaskGroup으로 묶음 (가득 찬 큐 앞에서 멈춰 있지 않음)
+    try:
+        async with asyncio.TaskGroup() as tg:
+            writer = tg.create_task(write_results(result_queue))
+            tg.create_task(analyze_batches(work_queue, result_queue, rows_by_text))
+            tg.create_task(produce_batches(rows, processed_nos, work_queue, result_queue, rows_by_text))
+    except ExceptionGroup as eg:
+        for e in eg.exceptions:
+            print(f"감정 분석 중 오류 발생: {e} (체크포인트: '{CHECKPOINT_DIR}')")
+        return False
+
+    # 저장되지 못한 행이 있으면 최종 결과를 덮어쓰지 않고 체크포인트를 남겨 둠
+    if not writer.result():
+        print(f"중간 저장에 실패한 행이 있어 최종 결과를 저장하지 않습니다. (체크포인트: '{CHECKPOINT_DIR}')")
+        return False
+
+    # 모두 끝나면 최종 결과를 엑셀로 한 번만 저장
+    return save_final_result()
+
+def run_threaded(processed_nos: set) -> bool:
+    """
+    원본 엑셀 전체를 DataFrame으로 불러와 스레드 풀로 감정 분석을 수행한 뒤 최종 결과를 저장합니다.
+    (asyncio를 쓸 수 없는 환경용)
+    
+    Args:
+        processed_nos (set): 이미 처리된 no 목록
+        
+    Returns:
+        bool: 최종 결과 저장까지 모두 끝났는지 여부
+    """
+    # 원본 데이터 불러오기 (calamine 엔진으로 빠르게 읽고, 사용하는 컬럼만 불러옴)
+    try:
+        df_input = pd.read_excel(
+            INPUT_EXCEL_PATH,
+            engine="calamine",
+            usecols=lambda column: column in INPUT_COLUMNS,
+        )
+    except Exception as e:
+        print(f"엑셀 파일({INPUT_EXCEL_PATH}) 읽기 오류: {e}")
+        return False
     
     # body 컬럼이 존재하는지 확인
     if "body" not in df_input.columns:
         print("엑셀 파일에 'body' 컬럼이 없습니다.")
-        return
+        return False
+
+    # 이미 처리된 no는 제외하고 아직 처리되지 않은 행만 추리기
+    df_pending = df_input.loc[~df_input["no"].isin(processed_nos)]
+
+    # 감정 분석 수행 (CHECKPOINT_EVERY개마다 체크포인트에 추가 저장)
+    if not analyze_pending_rows_threaded(df_pending):
+        # 저장되지 못한 행이 있으면 최종 결과를 덮어쓰지 않고 체크포인트를 남겨 둠
+        print(f"중간 저장에 실패한 행이 있어 최종 결과를 저장하지 않습니다. (체크포인트: '{CHECKPOINT_DIR}')")
+        return False
 
-    # 2) 이미 처리된 결과가 있는지 확인
-    if os.path.exists(OUTPUT_EXCEL_PATH):
+    # 모두 끝나면 최종 결과를 엑셀로 한 번만 저장
+    return save_final_result()
+
+def load_processed_nos() -> set:
+    """
+    이미 처리된 결과의 no 목록을 불러옵니다. (체크포인트가 있으면 우선 사용하고, 없으면 기존 결과 엑셀을 사용)
+    기존 결과 엑셀은 최종 저장 때 새 결과와 함께 다시 저장되도록 체크포인트의 첫 조각으로 옮겨 둡니다.
+    
+    Returns:
+        set: 이미 처리된 no 목록 (체크포인트/기존 결과를 읽거나 옮기지 못하면 None)
+    """
+    if os.path.isdir(CHECKPOINT_DIR):
+        try:
+            return load_checkpoint_nos()
+        except Exception as e:
+            print(f"체크포인트({CHECKPOINT_DIR}) 읽기 오류: {e}")
+            return None
+    elif os.path.exists(OUTPUT_EXCEL_PATH):
         # 기존 결과 불러오기
         try:
-            df_existing = pd.read_excel(OUTPUT_EXCEL_PATH)
+            df_existing = pd.read_excel(OUTPUT_EXCEL_PATH, engine="calamine").reindex(columns=RESULT_COLUMNS)
         except Exception as e:
+            # 읽지 못한 채 진행하면 최종 저장 때 기존 결과를 덮어쓰게 되므로 중단
             print(f"기존 결과 파일({OUTPUT_EXCEL_PATH}) 읽기 오류: {e}")
-            # 읽기 실패 시, 빈 데이터프레임으로 초기화
-            df_existing = pd.DataFrame(columns=["no", "title", "body", "vote", "comment", "emotion_result"])
+            return None
+        if not save_checkpoint(list(iter_rows(df_existing, RESULT_COLUMNS))):
+            # 다음 실행이 빈 체크포인트를 이어받아 기존 결과를 덮어쓰지 않도록 만들다 만 폴더를 지움
+            shutil.rmtree(CHECKPOINT_DIR, ignore_errors=True)
+            print(f"기존 결과를 체크포인트({CHECKPOINT_DIR})로 옮기지 못해 중단합니다.")
+            return None
     else:
         # 결과 파일이 없으면 새로 생성
-        df_existing = pd.DataFrame(columns=["no", "title", "body", "vote", "comment", "emotion_result"])
-    
-    # 3) 이미 처리된 no 목록 확인
-    processed_nos = set(df_existing["no"].dropna().astype(int).tolist())
+        df_existing = pd.DataFrame(columns=RESULT_COLUMNS)
+    return set(df_existing["no"].dropna().tolist())
 
-    # 4) 아직 처리되지 않은 행만 처리
-    for idx, row in tqdm(df_input.iterrows(), total=len(df_input), desc="감정 분석 진행중"):
-        # 현재 행의 no
-        row_no = int(row["no"]) if not pd.isna(row["no"]) else None
-        
-        # 이미 처리된 no이면 스킵
-        if row_no in processed_nos:
-            continue
-        
-        # body가 NaN이면 None 처리
-        body_text = row["body"] if not pd.isna(row["body"]) else None
-        if not body_text:
-            emotion_result = None
-        else:
-            # 감정 분석 수행
-            emotion_result = analyze_emotion(str(body_text))
-        
-        # 결과를 df_existing에 추가
-        new_row = {
-            "no": row["no"],
-            "title": row["title"],
-            "body": row["body"],
-            "vote": row["vote"],
-            "comment": row["comment"],
-            "emotion_result": emotion_result
-        }
-        # DataFrame으로 변환 후 concat
-        df_new = pd.DataFrame([new_row])
-        df_existing = pd.concat([df_existing, df_new], ignore_index=True)
+def main():
+    # 동시 실행 방식 확인
+    if EXECUTOR not in EXECUTORS:
+        print(f"EMOTION_EXECUTOR 값({EXECUTOR})이 올바르지 않습니다. {EXECUTORS} 중 하나로 설정하세요.")
+        return
 
-        # 혹시 중간에 순서가 뒤섞이지 않도록 원하는 컬럼 순서로 정렬
-        required_columns = ["no", "title", "body", "vote", "comment", "emotion_result"]
-        df_existing = df_existing[required_columns]
+    # 결과 저장 폴더 생성 (없으면)
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-        # 중간 저장 (바로바로 저장)
-        try:
-            df_existing.to_excel(OUTPUT_EXCEL_PATH, index=False)
-        except Exception as e:
-            tqdm.write(f"중간 저장 오류: {e}")
-            # 저장 실패 시에는 계속 진행하거나, 원하는 로직대로 처리 (여기서는 그냥 계속 진행)
-    
-    print(f"최종 감정 분석 결과가 '{OUTPUT_EXCEL_PATH}'에 저장되었습니다.")
+    # 1) 이미 처리된 결과가 있는지 확인
+    processed_nos = load_processed_nos()
+    if processed_nos is None:
+        return
+
+    # 2) 감정 분석 수행 후 최종 결과를 엑셀로 저장
+    if EXECUTOR == "thread":
+        completed = run_threaded(processed_nos)
+    else:
+        completed = asyncio.run(run_streaming(processed_nos))
+
+    if completed:
+        print(f"최종 감정 분석 결과가 '{OUTPUT_EXCEL_PATH}'에 저장되었습니다.")
 
 if __name__ == "__main__":
     main()
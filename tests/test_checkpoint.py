@@ -0,0 +1,57 @@
+import os
+import sys
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+os.environ.setdefault("GEMINI_API_KEY", "test")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+import keyword_nlp  # noqa: E402
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [76, "약 1천", None],
+        [1, datetime(2024, 1, 2, 3, 4, 5), None],
+        [1, True, False, None],
+        [1, 2.5, np.int64(3), None],
+        [1, 2.5, True, datetime(2024, 1, 2), "text", None],
+    ],
+)
+def test_checkpoint_round_trip_keeps_value_types(tmp_path, values):
+    df = pd.DataFrame({"vote": pd.Series(values, dtype=object), "no": range(len(values))})
+    path = tmp_path / "part.parquet"
+
+    keyword_nlp.encode_checkpoint(df).to_parquet(path, index=False)
+    decoded = keyword_nlp.decode_checkpoint(pd.read_parquet(path))
+
+    assert list(decoded.columns) == ["vote", "no"]
+    assert decoded["no"].tolist() == df["no"].tolist()
+    for original, restored in zip(values, decoded["vote"]):
+        if original is None:
+            assert restored is None
+        else:
+            assert restored == original
+            assert keyword_nlp.get_value_type(restored) == keyword_nlp.get_value_type(original)
+
+
+def test_single_type_columns_are_stored_as_is():
+    df = pd.DataFrame({"vote": pd.Series([1, 2, None], dtype=object), "body": ["a", "b", None]})
+
+    encoded = keyword_nlp.encode_checkpoint(df)
+
+    assert list(encoded.columns) == ["vote", "body"]
+
+
+def test_load_checkpoint_nos_reads_only_no_column(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_nlp, "CHECKPOINT_DIR", str(tmp_path))
+    row = ("title", "body", 1, 2, "Positive")
+    assert keyword_nlp.save_checkpoint([(1, *row), (2, *row)])
+    assert keyword_nlp.save_checkpoint([(3, *row), ("n-4", *row), (None, *row)])
+
+    assert keyword_nlp.load_checkpoint_nos() == {1, 2, 3, "n-4"}
+    assert len(keyword_nlp.load_checkpoint()) == 5